@@ -22,6 +22,10 @@ setup(
         'dev': [
             'black',
             'pytest',
+        ],
+        'speed': [
+            'numpy',
+            'regex',
         ]
     }
 )
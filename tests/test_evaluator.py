@@ -1,3 +1,5 @@
+from operator import itemgetter
+
 import pytest
 
 from text_evaluator.evaluator import TextConceptEvaluator
@@ -13,6 +15,28 @@ class TestTextConceptEvaluator:
             "https://www.biofid.de/ontology/3",
         ]
 
+    def test_evaluate_batch(self, evaluator, document_json_metadata):
+        batch_concepts = evaluator.get_concepts_from_batch(
+            [document_json_metadata, document_json_metadata]
+        )
+        expected_concepts = [
+            "https://www.biofid.de/ontology/1",
+            "https://www.biofid.de/ontology/2",
+            "https://www.biofid.de/ontology/3",
+        ]
+        assert batch_concepts == [expected_concepts, expected_concepts]
+
+    def test_evaluate_with_multiple_strategies(self, evaluator, document_json_metadata):
+        concepts_per_strategy = evaluator.get_concepts_for_strategies(
+            document_json_metadata, [DummyStrategy(), DummyStrategy()]
+        )
+        expected_concepts = [
+            "https://www.biofid.de/ontology/1",
+            "https://www.biofid.de/ontology/2",
+            "https://www.biofid.de/ontology/3",
+        ]
+        assert concepts_per_strategy == [expected_concepts, expected_concepts]
+
     @pytest.fixture
     def evaluator(self):
         strategy = DummyStrategy()
@@ -37,7 +61,7 @@ class DummyStrategy:
         concepts = [
             key
             for key, value in sorted(
-                document_metadata.statistics["count"].items(), key=lambda x: x[1]
+                document_metadata.statistics["count"].items(), key=itemgetter(1)
             )
         ]
         return Result(concepts=concepts)
@@ -233,6 +233,31 @@ class TestConceptFractionInAllConceptStrategy:
         result = strategy.parse(document_metadata)
         assert result.concepts == expected_concepts
 
+    def test_evaluate_from_json_metadata(self):
+        strategy = ConceptFractionInAllConceptsStrategy(min_fraction=0.2)
+        document_metadata = DocumentMetadata.from_json(
+            {
+                "statistics": {
+                    "count": {
+                        "https://www.biofid.de/ontology/2": 2,
+                        "https://www.biofid.de/ontology/1": 1,
+                        "https://www.biofid.de/ontology/3": 3,
+                        "https://www.biofid.de/ontology/4": 4,
+                        "https://www.biofid.de/ontology/5": 5,
+                    }
+                },
+                "fulltext": "",
+            }
+        )
+
+        result = strategy.parse(document_metadata)
+
+        assert result.concepts == [
+            "https://www.biofid.de/ontology/5",
+            "https://www.biofid.de/ontology/4",
+            "https://www.biofid.de/ontology/3",
+        ]
+
     @pytest.fixture
     def strategy(self, request):
         return ConceptFractionInAllConceptsStrategy(**request.param)
@@ -16,5 +16,26 @@ class TextConceptEvaluator:
         result = self.strategy.parse(document_metadata)
         return result.concepts
 
+    def get_concepts_for_strategies(
+        self, document_json_metadata: dict, strategies: List[Strategy]
+    ) -> List[List[str]]:
+        """Evaluates the given document metadata under multiple strategies.
+        The document metadata is converted only once and reused for all
+        strategies. Returns one concept list per strategy, in the same order."""
+        document_metadata = self.metadata2object(document_json_metadata)
+        return [strategy.parse(document_metadata).concepts for strategy in strategies]
+
+    def get_concepts_from_batch(
+        self, document_json_metadata_batch: List[dict]
+    ) -> List[List[str]]:
+        """Evaluates multiple document metadata dicts in one call.
+        Returns one concept list per given document, in the same order."""
+        strategy_parse = self.strategy.parse
+        metadata2object = self.metadata2object
+        return [
+            strategy_parse(metadata2object(metadata)).concepts
+            for metadata in document_json_metadata_batch
+        ]
+
     def metadata2object(self, metadata: dict) -> DocumentMetadata:
-        return DocumentMetadata(statistics=metadata['statistics'], text=metadata['fulltext'])
+        return DocumentMetadata.from_json(metadata)
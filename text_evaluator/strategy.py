@@ -1,8 +1,25 @@
-import re
+import heapq
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from functools import cached_property
+from operator import itemgetter
+from dataclasses import dataclass, field
 from typing import List, Protocol, Optional
 
+try:
+    # The third-party "regex" package ships a faster matching engine than the
+    # built-in "re" module and is used when installed (extra "speed").
+    import regex as re
+except ImportError:
+    import re
+
+try:
+    # NumPy enables a vectorized count layout and is optional (extra "speed").
+    import numpy
+except ImportError:
+    numpy = None
+
+re_mentioned_concept_uris = re.compile(r"biofid-uri-\d+='([^']+)'")
+
 
 @dataclass
 class DocumentMetadata:
@@ -10,6 +27,33 @@ class DocumentMetadata:
 
     statistics: dict
     text: str = ""
+    uris: tuple = ()
+    count_array: Optional["numpy.ndarray"] = field(
+        default=None, compare=False, repr=False
+    )
+
+    @classmethod
+    def from_json(cls, metadata: dict) -> "DocumentMetadata":
+        """Creates a DocumentMetadata from a JSON document metadata dict.
+        When NumPy is installed, the count statistics are additionally stored as
+        a flat URI tuple plus count array, enabling vectorized evaluation."""
+        document_metadata = cls(
+            statistics=metadata["statistics"], text=metadata["fulltext"]
+        )
+
+        if numpy is not None:
+            counts = document_metadata.counts
+            document_metadata.uris = tuple(counts)
+            document_metadata.count_array = numpy.fromiter(
+                counts.values(), dtype=numpy.int64, count=len(counts)
+            )
+
+        return document_metadata
+
+    @cached_property
+    def counts(self) -> dict:
+        """The URI count statistics of the document, resolved once per instance."""
+        return self.statistics.get("count", {})
 
 
 @dataclass
@@ -30,23 +74,28 @@ class Strategy(Protocol):
 class CountStatisticsStrategy(ABC):
     """A base class for all Strategies that rely on the count of URIs in the document."""
 
+    __slots__ = ()
+
     evaluated_statistics_name = "count"
 
 
 class AllInSortedStrategy(CountStatisticsStrategy):
     """Simply passes all available concepts sorted by their count."""
 
+    __slots__ = ()
+
     def parse(self, document_metadata: DocumentMetadata) -> Result:
+        if not document_metadata.counts:
+            return Result(concepts=[])
+
         return Result(concepts=self.evaluate_metadata(document_metadata))
 
     def evaluate_metadata(self, document_metadata: DocumentMetadata) -> list:
-        concept_count_data = document_metadata.statistics[
-            self.evaluated_statistics_name
-        ]
+        concept_count_data = document_metadata.counts
         return [
             uri
             for uri, _ in sorted(
-                concept_count_data.items(), key=lambda x: x[1], reverse=True
+                concept_count_data.items(), key=itemgetter(1), reverse=True
             )
         ]
 
@@ -57,6 +106,8 @@ class FractionEvaluationStrategy(CountStatisticsStrategy):
     :param min_fraction: A minimum fraction that has to be fulfilled for a term to be a concept.
     """
 
+    __slots__ = ("number_of_concepts", "min_fraction")
+
     def __init__(
         self, number_of_concepts: int = 10, min_fraction: Optional[float] = None
     ):
@@ -64,87 +115,149 @@ class FractionEvaluationStrategy(CountStatisticsStrategy):
         self.min_fraction = min_fraction
 
     @abstractmethod
-    def evaluate_metadata(self, document_metadata: DocumentMetadata) -> dict:
-        """Evaluates the given metadata and returns the result as a dict.
-        The resulting dict should look like:
-            {
-                'concept_a': 0.3,
-                'concept_b': 0.12,
-                ...
-            }
-        with the key being the concept name and the value the fraction of this concept in the data.
-        """
+    def _denominator(self, document_metadata: DocumentMetadata) -> float:
+        """Returns the value the concept counts are divided by to obtain fractions
+        (e.g. the word count of the fulltext or the total annotation count)."""
         pass
 
     def parse(self, document_metadata: DocumentMetadata) -> Result:
-        evaluated_concept_statistics = self.evaluate_metadata(document_metadata)
-        return self._create_result(evaluated_concept_statistics)
+        counts = document_metadata.counts
+        if not counts:
+            return Result(concepts=[])
 
-    def _create_result(self, evaluated_concept_statistics: dict) -> Result:
-        filtered_concepts = self._filter_concepts(evaluated_concept_statistics)
+        denominator = self._denominator(document_metadata)
+        if not denominator:
+            return Result(concepts=[])
 
-        sorted_concepts = [
-            concept_name
-            for concept_name, _ in sorted(
-                filtered_concepts.items(), key=lambda item: item[1], reverse=True
+        concept_fractions = (
+            (concept_name, count / denominator)
+            for concept_name, count in counts.items()
+        )
+        min_fraction = self.min_fraction
+        if min_fraction is not None:
+            concept_fractions = (
+                concept_fraction
+                for concept_fraction in concept_fractions
+                if concept_fraction[1] >= min_fraction
             )
-        ]
 
-        return Result(concepts=sorted_concepts[: self.number_of_concepts + 1])
+        maximum_concept_count = self.number_of_concepts + 1
+        if len(counts) <= maximum_concept_count:
+            top_concepts = sorted(concept_fractions, key=itemgetter(1), reverse=True)
+        else:
+            top_concepts = heapq.nlargest(
+                maximum_concept_count, concept_fractions, key=itemgetter(1)
+            )
 
-    def _filter_concepts(self, evaluated_concept_statistics: dict) -> dict:
-        return {
-            uri: uri_fraction_in_text
-            for uri, uri_fraction_in_text in evaluated_concept_statistics.items()
-            if self.min_fraction is None or uri_fraction_in_text >= self.min_fraction
-        }
+        return Result(concepts=[concept_name for concept_name, _ in top_concepts])
 
 
 class ConceptFractionInAllWordsStrategy(FractionEvaluationStrategy):
     """Calculates the fraction of each URI considering all words in the fulltext.
     Annotated multi-token words will be considered as a single word!"""
 
-    re_extract_annotated_words = re.compile(r"<em.+>(.+?)</em>")
-    re_word_split = re.compile(r"<.*?>|\s")
-
-    def evaluate_metadata(self, document_metadata: DocumentMetadata) -> dict:
-        text = document_metadata.text
-
-        # Replace annotated (potentially multi-token) words with a single word
-        text = self.re_extract_annotated_words.sub("foo", text, re.DOTALL)
-
-        words = {word for word in self.re_word_split.split(text) if word}
-        word_count = len(words)
-
-        return {
-            concept_name: count / word_count
-            for concept_name, count in document_metadata.statistics[
-                self.evaluated_statistics_name
-            ].items()
-        }
-
-
-class ConceptFractionInAllConceptsStrategy(ConceptFractionInAllWordsStrategy):
+    __slots__ = ()
+
+    ANNOTATED_WORD_PLACEHOLDER = "foo"
+
+    def _denominator(self, document_metadata: DocumentMetadata) -> float:
+        if self.min_fraction is None:
+            # Without a threshold only the concept ordering matters, and that is
+            # invariant under the constant word-count divisor - so the costly
+            # text scan can be skipped.
+            return 1
+        return self._count_words(document_metadata.text)
+
+    def _count_words(self, text: str) -> int:
+        """Counts the unique words in the given text in a single pass.
+        Tags and whitespace delimit words; an annotated (potentially multi-token)
+        `<em>...</em>` span counts as a single word. Repeated words are counted
+        only once, so the returned count is the size of the text's vocabulary."""
+        words = set()
+        add_word = words.add
+        # A memchr-style substring scan is far cheaper than checking for an
+        # opening annotation tag at every "<" during the character walk.
+        has_annotations = "<em" in text
+        position = 0
+        word_start = -1
+        text_length = len(text)
+
+        while position < text_length:
+            character = text[position]
+            if character == "<":
+                if word_start >= 0:
+                    add_word(text[word_start:position])
+                    word_start = -1
+                if has_annotations and text.startswith("<em", position):
+                    add_word(self.ANNOTATED_WORD_PLACEHOLDER)
+                    annotation_end = text.find("</em>", position)
+                    position = (
+                        text_length
+                        if annotation_end == -1
+                        else annotation_end + len("</em>")
+                    )
+                else:
+                    tag_end = text.find(">", position)
+                    position = text_length if tag_end == -1 else tag_end + 1
+                continue
+
+            if character.isspace():
+                if word_start >= 0:
+                    add_word(text[word_start:position])
+                    word_start = -1
+            elif word_start < 0:
+                word_start = position
+
+            position += 1
+
+        if word_start >= 0:
+            add_word(text[word_start:])
+
+        return len(words)
+
+
+class ConceptFractionInAllConceptsStrategy(FractionEvaluationStrategy):
     """Very similar to ConceptFractionInAllWordsStrategy, but only takes into account the numbers of annotations."""
 
-    def evaluate_metadata(self, document_metadata: DocumentMetadata) -> dict:
-        annotation_count = sum(
-            document_metadata.statistics[self.evaluated_statistics_name].values()
+    __slots__ = ()
+
+    def parse(self, document_metadata: DocumentMetadata) -> Result:
+        count_array = document_metadata.count_array
+        if count_array is None:
+            return super().parse(document_metadata)
+
+        total_count = count_array.sum()
+        if not total_count:
+            return Result(concepts=[])
+
+        fractions = count_array / total_count
+        # The stable sort keeps the tie ordering of the dict-based path.
+        concept_order = numpy.argsort(-fractions, kind="stable")
+        min_fraction = self.min_fraction
+        if min_fraction is not None:
+            concept_order = concept_order[fractions[concept_order] >= min_fraction]
+
+        uris = document_metadata.uris
+        return Result(
+            concepts=[
+                uris[index] for index in concept_order[: self.number_of_concepts + 1]
+            ]
         )
 
-        return {
-            concept_name: count / annotation_count
-            for concept_name, count in document_metadata.statistics[
-                self.evaluated_statistics_name
-            ].items()
-        }
+    def _denominator(self, document_metadata: DocumentMetadata) -> float:
+        return sum(document_metadata.counts.values())
 
 
 class ConceptFractionFilteredByFractionAverageStrategy(CountStatisticsStrategy):
     """Calculates the average fraction of all URIs and filters out all concepts that are below that value.
     This approach leads to shorter texts having probably fewer returned concepts than longer texts."""
 
+    __slots__ = ()
+
     def parse(self, document_metadata: DocumentMetadata) -> Result:
+        if not document_metadata.counts:
+            return Result(concepts=[])
+
         evaluated_concept_statistics = self.evaluate_metadata(document_metadata)
 
         avg_concept_fraction = self._calculate_concept_fraction_average(
@@ -161,27 +274,19 @@ class ConceptFractionFilteredByFractionAverageStrategy(CountStatisticsStrategy):
         return self._create_result(filtered_concepts)
 
     def evaluate_metadata(self, document_metadata: DocumentMetadata) -> dict:
-        return {
-            concept_name: count
-            for concept_name, count in document_metadata.statistics[
-                self.evaluated_statistics_name
-            ].items()
-        }
+        counts = document_metadata.counts
+        return {concept_name: count for concept_name, count in counts.items()}
 
     def _calculate_concept_fraction_average(
         self, document_metadata: DocumentMetadata
     ) -> float:
-        annotation_count = sum(
-            document_metadata.statistics[self.evaluated_statistics_name].values()
-        )
-        number_of_concepts = len(
-            document_metadata.statistics[self.evaluated_statistics_name]
-        )
+        counts = document_metadata.counts
+        number_of_concepts = len(counts)
 
         if number_of_concepts == 0:
             return 0.0
 
-        return annotation_count / number_of_concepts
+        return sum(counts.values()) / number_of_concepts
 
     def _create_result(
         self,
@@ -194,7 +299,7 @@ class ConceptFractionFilteredByFractionAverageStrategy(CountStatisticsStrategy):
                 concept_name
                 for concept_name, _ in sorted(
                     evaluated_concept_statistics.items(),
-                    key=lambda item: item[1],
+                    key=itemgetter(1),
                     reverse=True,
                 )
             ]
@@ -217,18 +322,26 @@ class ConceptFilteredByFractionAverageMentionsBoostedStrategy(
     """Works like ConceptFractionFilteredByFractionAverageStrategy, but boosts concepts that are specifically
     mentioned in the text."""
 
+    __slots__ = ()
+
     MENTIONED_CONCEPT_BOOST: float = 2.0
 
     def evaluate_metadata(self, document_metadata: DocumentMetadata) -> dict:
+        text = document_metadata.text
+        counts = document_metadata.counts
+        mentioned_concepts = set(re_mentioned_concept_uris.findall(text))
+        boost = self.MENTIONED_CONCEPT_BOOST
+        boost_is_square = boost == 2.0
+
         def concept_value(concept_name: str, concept_count: float) -> float:
-            if concept_name in document_metadata.text:
-                return pow(concept_count, self.MENTIONED_CONCEPT_BOOST)
+            if concept_name in mentioned_concepts:
+                if boost_is_square:
+                    return concept_count * concept_count
+                return concept_count ** boost
             else:
                 return concept_count
 
         return {
             concept_name: concept_value(concept_name, count)
-            for concept_name, count in document_metadata.statistics[
-                self.evaluated_statistics_name
-            ].items()
+            for concept_name, count in counts.items()
         }